@@ -2,19 +2,38 @@
 JWT Authentication utilities
 """
 import os
+import time
+import asyncio
+import hashlib
+import threading
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Optional, Tuple
+from cachetools import TTLCache, TLRUCache
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from database import get_db
 from models import User
-
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from schemas import UserResponse
+
+# Password hashing: new hashes use Argon2id; bcrypt hashes still verify and are
+# upgraded to Argon2id on the next successful login
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__type="ID",
+    argon2__time_cost=3,
+    argon2__memory_cost=65536,  # 64 MiB
+    argon2__parallelism=4,
+)
+
+# Each Argon2id hash holds 64 MiB and 4 lanes, so cap how many run at once instead
+# of letting a login burst fill the default thread pool
+_hash_semaphore = asyncio.Semaphore(os.cpu_count() or 1)
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
@@ -24,10 +43,30 @@ SECRET_KEY = os.getenv("JWT_SECRET", "your-secret-key-change-this")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 
+# Short-lived caches for verified tokens and their users. TTLs are kept far below
+# the token lifetime so a revoked/deactivated account is honoured within a minute.
+# Keys are truncated SHA-256 digests; raw tokens are never stored.
+TOKEN_CACHE_TTL = 30
+USER_CACHE_TTL = 60
+
+
+def _token_cache_ttu(_key, token_data, now: float) -> float:
+    """Expire a cached token after TOKEN_CACHE_TTL, but never later than its own exp"""
+    expires = now + TOKEN_CACHE_TTL
+    if token_data.expires_at is not None:
+        expires = min(expires, token_data.expires_at)
+    return expires
+
+
+_token_cache: TLRUCache = TLRUCache(maxsize=10000, ttu=_token_cache_ttu, timer=time.time)
+_user_cache: TTLCache = TTLCache(maxsize=5000, ttl=USER_CACHE_TTL)
+_cache_lock = threading.Lock()
+
 
 class TokenData(BaseModel):
     user_id: Optional[str] = None
     email: Optional[str] = None
+    expires_at: Optional[float] = None  # JWT exp as a Unix timestamp
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -35,11 +74,27 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and return a replacement hash if the stored one is outdated
+
+    Returns:
+        (is_valid, new_hash) - new_hash is None unless the hash needs upgrading
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
 
 
+async def run_password_hashing(func: Callable[..., Any], *args: Any) -> Any:
+    """Run a CPU-bound hash/verify call off the event loop, at most one per CPU at a time"""
+    async with _hash_semaphore:
+        return await asyncio.to_thread(func, *args)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -66,7 +121,7 @@ def decode_access_token(token: str) -> TokenData:
                 detail="Could not validate credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        return TokenData(user_id=user_id, email=email)
+        return TokenData(user_id=user_id, email=email, expires_at=payload.get("exp"))
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -75,13 +130,43 @@ def decode_access_token(token: str) -> TokenData:
         )
 
 
-def get_current_user(
+def _token_cache_key(token: str) -> str:
+    """Cache key for a JWT (never the raw token)"""
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+
+def decode_access_token_cached(token: str) -> TokenData:
+    """Decode a JWT, reusing the verified payload for a short TTL"""
+    key = _token_cache_key(token)
+    with _cache_lock:
+        token_data = _token_cache.get(key)
+
+    if token_data is None:
+        token_data = decode_access_token(token)
+        with _cache_lock:
+            _token_cache[key] = token_data
+
+    return token_data
+
+
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_db)
+) -> UserResponse:
     """Get the current authenticated user"""
-    token_data = decode_access_token(token)
-    user = db.query(User).filter(User.id == token_data.user_id).first()
+    token_data = decode_access_token_cached(token)
+
+    with _cache_lock:
+        user = _user_cache.get(token_data.user_id)
+
+    if user is None:
+        result = await db.execute(select(User).where(User.id == token_data.user_id))
+        db_user = result.scalar_one_or_none()
+        if db_user is not None:
+            # Cache a plain snapshot, never the session-bound ORM instance
+            user = UserResponse.model_validate(db_user)
+            with _cache_lock:
+                _user_cache[token_data.user_id] = user
 
     if user is None:
         raise HTTPException(
@@ -99,9 +184,9 @@ def get_current_user(
     return user
 
 
-def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+async def get_current_active_user(
+    current_user: UserResponse = Depends(get_current_user)
+) -> UserResponse:
     """Get the current active user"""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
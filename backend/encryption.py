@@ -2,15 +2,32 @@
 Encryption utilities for sensitive data (GitLab tokens)
 """
 import os
+import threading
+from typing import Optional, Any
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.backends import default_backend
 import base64
 
+# Prefer the Rust Fernet binding (wire-compatible, much faster per call) when installed
+try:
+    from rfernet import Fernet as _RustFernet
+except ImportError:
+    _RustFernet = None
 
-def get_encryption_key() -> bytes:
-    """Get or generate encryption key from environment"""
+
+# PBKDF2 iterations used when ENCRYPTION_KEY is a passphrase rather than a Fernet key
+KDF_ITERATIONS = int(os.getenv("ENCRYPTION_KDF_ITERATIONS", "100000"))
+
+# Derived key and Fernet instance are cached so the KDF runs once per process
+_KEY_CACHE: Optional[bytes] = None
+_FERNET_CACHE: Optional[Any] = None
+_KEY_LOCK = threading.Lock()
+
+
+def _derive_encryption_key() -> bytes:
+    """Read the encryption key from environment, deriving one if needed"""
     key_str = os.getenv("ENCRYPTION_KEY")
 
     if not key_str:
@@ -27,30 +44,82 @@ def get_encryption_key() -> bytes:
         Fernet(test_key)
         return test_key
     except Exception:
-        # Not a valid Fernet key, derive one using PBKDF2
+        # Not a valid Fernet key, derive one using PBKDF2. This is a bootstrap-only
+        # fallback; changing the iteration count changes the derived key, so
+        # existing deployments must keep the value their tokens were encrypted with.
         salt = b"code-review-salt"  # In production, use a random salt stored securely
         kdf = PBKDF2HMAC(
             algorithm=hashes.SHA256(),
             length=32,
             salt=salt,
-            iterations=100000,
+            iterations=KDF_ITERATIONS,
             backend=default_backend()
         )
         key = base64.urlsafe_b64encode(kdf.derive(key_str.encode()))
         return key
 
 
+def get_encryption_key() -> bytes:
+    """Get or generate encryption key from environment"""
+    global _KEY_CACHE
+    if _KEY_CACHE is not None:
+        return _KEY_CACHE
+
+    with _KEY_LOCK:
+        if _KEY_CACHE is None:
+            _KEY_CACHE = _derive_encryption_key()
+        return _KEY_CACHE
+
+
+class _RustFernetAdapter:
+    """Give rfernet the cryptography.Fernet bytes-in/bytes-out interface (rfernet works on str tokens)"""
+
+    def __init__(self, key: bytes):
+        self._fernet = _RustFernet(key.decode())
+
+    def encrypt(self, data: bytes) -> bytes:
+        return self._fernet.encrypt(data).encode()
+
+    def decrypt(self, token: bytes) -> bytes:
+        return self._fernet.decrypt(bytes(token).decode())
+
+
+def _build_fernet(key: bytes) -> Any:
+    """Build the cipher, using rfernet only if it round-trips with cryptography's Fernet"""
+    fernet = Fernet(key)
+    if _RustFernet is None:
+        return fernet
+
+    try:
+        rust = _RustFernetAdapter(key)
+        probe = b"code-review-fernet-probe"
+        if rust.decrypt(fernet.encrypt(probe)) == probe and fernet.decrypt(rust.encrypt(probe)) == probe:
+            return rust
+    except Exception as e:
+        print(f"WARNING: rfernet failed compatibility check, using cryptography Fernet: {e}")
+    return fernet
+
+
+def _get_fernet() -> Any:
+    """Get the shared Fernet instance (rfernet if available) for the process encryption key"""
+    global _FERNET_CACHE
+    if _FERNET_CACHE is None:
+        _FERNET_CACHE = _build_fernet(get_encryption_key())
+    return _FERNET_CACHE
+
+
+def init_encryption() -> None:
+    """Derive the key and build the cipher ahead of the first request"""
+    _get_fernet()
+
+
 def encrypt_token(token: str) -> bytes:
     """Encrypt a GitLab access token"""
-    key = get_encryption_key()
-    fernet = Fernet(key)
-    encrypted = fernet.encrypt(token.encode())
+    encrypted = _get_fernet().encrypt(token.encode())
     return encrypted
 
 
 def decrypt_token(encrypted_token: bytes) -> str:
     """Decrypt a GitLab access token"""
-    key = get_encryption_key()
-    fernet = Fernet(key)
-    decrypted = fernet.decrypt(encrypted_token)
+    decrypted = _get_fernet().decrypt(encrypted_token)
     return decrypted.decode()
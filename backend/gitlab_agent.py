@@ -1,15 +1,24 @@
 """
-GitLab Agent - Agno agent for GitLab operations with config selection
+GitLab Agent - GitLab operations (MR listing/details) with config selection
 """
 
-from typing import List, Optional, Dict, Any
-from agno.agent import Agent
-from agno.models.ollama import Ollama
-import os
+from typing import List, Optional
+import re
 
 from models import GitLabConfig
 from gitlab_tools import list_merge_requests, get_merge_request_details, set_gitlab_config
 
+# Query router: an MR number (e.g., "!123", "MR 123", "merge request 456") or a
+# list/show keyword. The MR number alternative is tried first at each position.
+_ROUTER_RE = re.compile(
+    r'(?:!|mr|merge\s+request)\s*(?P<mrnum>\d+)'
+    r'|(?P<list>list|show|merge request|mr|pull request)'
+)
+
+# MR state filter mentioned in a query (defaults to "opened" when absent)
+_STATE_RE = re.compile(r'\b(closed|merged|all)\b')
+_STATE_PRIORITY = ('closed', 'merged', 'all')
+
 
 class GitLabAgent:
     """
@@ -33,35 +42,8 @@ class GitLabAgent:
         self.gitlab_configs = gitlab_configs
         self.selected_config: Optional[GitLabConfig] = None
 
-        # Initialize Ollama model
-        model_name = os.getenv("OLLAMA_MODEL", "llama3.2")
-        base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-        ollama_model = Ollama(id=model_name, host=base_url)
-
-        # Instructions for the agent
-        instructions = f"""You are a helpful GitLab assistant. You can help users with their merge requests.
-
-You have access to these tools:
-- list_merge_requests: Get a list of merge requests (specify state: opened, closed, merged, or all)
-- get_merge_request_details: Get full details about a specific merge request by number
-
-When users ask about merge requests, use these tools to help them.
-
-Examples:
-- "show me merge requests" → call list_merge_requests with state="opened"
-- "list all MRs" → call list_merge_requests with state="all"
-- "show details of MR 1312" → call get_merge_request_details with mr_number=1312
-- "what's in merge request !456" → call get_merge_request_details with mr_number=456
-
-Always be helpful and provide clear, formatted responses based on the tool results."""
-
-        # Create agent with GitLab tools
-        self.agent = Agent(
-            model=ollama_model,
-            tools=[list_merge_requests, get_merge_request_details],
-            instructions=instructions,
-            markdown=True,
-        )
+        # Configs are fixed for the agent's lifetime, so format the list once
+        self._config_list_cached = self.list_gitlab_configs()
 
     def list_gitlab_configs(self) -> str:
         """
@@ -117,47 +99,24 @@ Always be helpful and provide clear, formatted responses based on the tool resul
             return "❌ **No GitLab Configurations Found**\n\nPlease add a GitLab configuration in the settings (⚙️ icon in top-right) before using GitLab commands."
 
         # First, ask user to select a GitLab config
-        config_list = self.list_gitlab_configs()
+        config_list = self._config_list_cached
 
         if command.startswith("/show-mr"):
-            prompt = f"""You are a helpful GitLab assistant. The user wants to see their merge requests.
-
-Available GitLab Configurations:
-{config_list}
-
-Please respond in a friendly, conversational way asking the user to select which GitLab configuration they want to use.
-
-Format your response like this:
-- Start with a brief acknowledgment of their request
-- Show them the available configurations in a clean format
-- Ask them to reply with the configuration ID they want to use
-- Be helpful and friendly
-
-Do not use technical jargon. Keep it simple and user-friendly."""
-
-            run_output = self.agent.run(prompt)
-            return self._extract_response(run_output)
+            return (
+                "👋 Sure, let's look at your merge requests! "
+                "Which GitLab configuration would you like to use?\n\n"
+                f"{config_list}\n\n"
+                "Reply with the configuration ID you want to use."
+            )
 
         elif command.startswith("/review-mr"):
-            prompt = f"""You are a helpful GitLab assistant. The user wants to perform an AI-powered code review of a merge request.
-
-Available GitLab Configurations:
-{config_list}
-
-Please respond in a friendly, conversational way asking the user to:
-1. First, select which GitLab configuration to use
-2. Explain that after they select a config, you'll show them available merge requests to review
-
-Format your response like this:
-- Start with a brief acknowledgment of their request
-- Show them the available configurations in a clean format
-- Ask them to reply with the configuration ID they want to use
-- Be helpful and friendly
-
-Do not use technical jargon. Keep it simple and user-friendly."""
-
-            run_output = self.agent.run(prompt)
-            return self._extract_response(run_output)
+            return (
+                "👋 Happy to help review a merge request! "
+                "Which GitLab configuration would you like to use?\n\n"
+                f"{config_list}\n\n"
+                "Reply with the configuration ID you want to use. "
+                "After that, I'll show you the merge requests available for review."
+            )
 
         else:
             return f"❌ Unknown command: `{command}`\n\nAvailable commands:\n- `/show-mr` - Show merge requests\n- `/review-mr` - Review a merge request"
@@ -214,7 +173,7 @@ Do not use technical jargon. Keep it simple and user-friendly."""
                 if len(active_configs) == 1:
                     self.selected_config = active_configs[0]
                 else:
-                    config_list = self.list_gitlab_configs()
+                    config_list = self._config_list_cached
                     return f"Please select a GitLab configuration first:\n\n{config_list}\n\nThen use `/show-mr` or `/review-mr` to get started."
 
         # Set the config for the tools to use
@@ -223,120 +182,28 @@ Do not use technical jargon. Keep it simple and user-friendly."""
         # Parse query and call appropriate tools directly
         query_lower = query.lower()
 
-        # Check for MR number pattern (e.g., "!123", "MR 123", "merge request 456")
-        import re
-        mr_number_match = re.search(r'(?:!|mr|merge\s+request)\s*(\d+)', query_lower)
+        # Single pass over the query: an MR number anywhere wins over list keywords
+        mr_number = None
+        is_list_query = False
+        for match in _ROUTER_RE.finditer(query_lower):
+            if match.lastgroup == 'mrnum':
+                mr_number = int(match.group('mrnum'))
+                break
+            is_list_query = True
 
-        if mr_number_match:
+        if mr_number is not None:
             # User wants details about a specific MR
-            mr_number = int(mr_number_match.group(1))
             result = await get_merge_request_details(mr_number)
             return result
 
         # Check for list/show MR requests
-        if any(keyword in query_lower for keyword in ['list', 'show', 'merge request', 'mr', 'pull request']):
-            # Determine state from query
-            if 'closed' in query_lower:
-                state = 'closed'
-            elif 'merged' in query_lower:
-                state = 'merged'
-            elif 'all' in query_lower:
-                state = 'all'
-            else:
-                state = 'opened'  # Default to opened
+        if is_list_query:
+            # Determine state from query (closed > merged > all when several are mentioned)
+            states = set(_STATE_RE.findall(query_lower))
+            state = next((st for st in _STATE_PRIORITY if st in states), 'opened')  # Default to opened
 
             result = await list_merge_requests(state=state)
             return result
 
         # If no clear pattern, return None (not a GitLab query)
         return None
-
-    def _extract_agent_response(self, run_output) -> str:
-        """
-        Extract the final text response from agent run output with tool calls.
-
-        This method properly handles Agno RunResponse objects that include tool calls
-        and tool results, extracting only the final assistant response.
-        """
-        # First, check for messages list (most common in Agno)
-        if hasattr(run_output, 'messages') and run_output.messages:
-            # Iterate through messages in reverse to find the last assistant message
-            # that contains actual content (not just tool calls)
-            for msg in reversed(run_output.messages):
-                # Skip non-assistant messages
-                if not hasattr(msg, 'role') or msg.role != 'assistant':
-                    continue
-
-                # Check if message has content
-                if hasattr(msg, 'content'):
-                    content = msg.content
-
-                    # If content is a string, use it
-                    if isinstance(content, str) and content.strip():
-                        return content
-
-                    # If content is a list, extract text from it
-                    if isinstance(content, list):
-                        text_parts = []
-                        for item in content:
-                            # Skip tool use objects
-                            if isinstance(item, dict):
-                                if item.get('type') == 'text' and 'text' in item:
-                                    text_parts.append(item['text'])
-                                # Skip tool_use type
-                                elif item.get('type') == 'tool_use':
-                                    continue
-                            elif hasattr(item, 'type'):
-                                # Object with type attribute
-                                if getattr(item, 'type', None) == 'text' and hasattr(item, 'text'):
-                                    text_parts.append(item.text)
-                                # Skip tool_use
-                                elif getattr(item, 'type', None) == 'tool_use':
-                                    continue
-                            elif isinstance(item, str):
-                                text_parts.append(item)
-
-                        if text_parts:
-                            return '\n'.join(text_parts)
-
-        # Fallback: Try content attribute directly
-        if hasattr(run_output, 'content'):
-            content = run_output.content
-
-            if isinstance(content, str) and content.strip():
-                return content
-
-            # If content is a list, extract text
-            if isinstance(content, list):
-                text_parts = []
-                for item in content:
-                    if isinstance(item, dict) and item.get('type') == 'text':
-                        text_parts.append(item.get('text', ''))
-                    elif isinstance(item, str):
-                        text_parts.append(item)
-
-                if text_parts:
-                    return '\n'.join(text_parts)
-
-        # Try text attribute
-        if hasattr(run_output, 'text') and run_output.text:
-            return run_output.text
-
-        # Try message attribute
-        if hasattr(run_output, 'message'):
-            msg = run_output.message
-            if hasattr(msg, 'content'):
-                return str(msg.content)
-            return str(msg)
-
-        # Last resort - convert to string
-        return str(run_output)
-
-    def _extract_response(self, run_output) -> str:
-        """Extract text response from agent run output (for simple non-tool queries)"""
-        # For simple queries without tool calls, use the simpler extraction
-        if hasattr(run_output, 'content') and isinstance(run_output.content, str):
-            return run_output.content
-
-        # Otherwise, use the comprehensive extraction method
-        return self._extract_agent_response(run_output)
@@ -2,16 +2,27 @@
 GitLab Tools - Functions that the agent can call to interact with GitLab
 """
 
+import asyncio
+import io
+from functools import lru_cache
 import httpx
+import orjson
 from typing import Optional
 from models import GitLabConfig
 from encryption import decrypt_token
+from http_client import get_http_client
 
 
 # Store the current config globally (will be set before agent creation)
 _current_gitlab_config: Optional[GitLabConfig] = None
 
 
+@lru_cache(maxsize=32)
+def _decrypt_cached(encrypted_token: bytes) -> str:
+    """Decrypt a config's access token once and reuse it while the ciphertext is unchanged"""
+    return decrypt_token(encrypted_token)
+
+
 def set_gitlab_config(config: GitLabConfig):
     """Set the GitLab configuration to use for all tool calls"""
     global _current_gitlab_config
@@ -36,58 +47,64 @@ async def list_merge_requests(state: str = "opened") -> str:
 
     try:
         # Decrypt token
-        token = decrypt_token(_current_gitlab_config.access_token_encrypted)
+        token = _decrypt_cached(bytes(_current_gitlab_config.access_token_encrypted))
 
         # Call GitLab API
         url = f"{_current_gitlab_config.gitlab_url}/api/v4/projects/{_current_gitlab_config.project_id}/merge_requests"
         headers = {"PRIVATE-TOKEN": token}
-        params = {"state": state}
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers, params=params, timeout=10.0)
-            response.raise_for_status()
-
-            merge_requests = response.json()
-
-            if not merge_requests:
-                return f"No {state} merge requests found in project {_current_gitlab_config.project_id}."
-
-            # Format MR list
-            mr_list = []
-            for mr in merge_requests[:10]:  # Limit to 10 MRs
-                # Get labels
-                labels = ", ".join([f"`{label}`" for label in mr.get('labels', [])]) if mr.get('labels') else "None"
-
-                # Get approvals info
-                upvotes = mr.get('upvotes', 0)
-                downvotes = mr.get('downvotes', 0)
-                approvals = f"👍 {upvotes}" if upvotes > 0 else ""
-                if downvotes > 0:
-                    approvals += f" 👎 {downvotes}"
-
-                # Format dates
-                created = mr['created_at'].split('T')[0]
-                updated = mr['updated_at'].split('T')[0]
-
-                mr_list.append(
-                    f"### MR !{mr['iid']}: {mr['title']}\n\n"
-                    f"- **Author:** {mr['author']['name']} (@{mr['author']['username']})\n"
-                    f"- **Status:** `{mr['state']}` {approvals}\n"
-                    f"- **Branch:** `{mr['source_branch']}` → `{mr['target_branch']}`\n"
-                    f"- **Labels:** {labels}\n"
-                    f"- **Created:** {created} | **Updated:** {updated}\n"
-                    f"- **URL:** {mr['web_url']}"
-                )
-
-            result = f"# 📋 Merge Requests in Project {_current_gitlab_config.project_id}\n\n"
-            result += f"**Filter:** {state} | **Total:** {len(merge_requests)}\n\n"
-            result += "---\n\n"
-            result += "\n\n".join(mr_list)
-
-            if len(merge_requests) > 10:
-                result += f"\n\n---\n\n*... and {len(merge_requests) - 10} more merge requests*"
-
-            return result
+        params = {"state": state, "per_page": 10, "page": 1}  # Only fetch the 10 MRs we display
+
+        client = get_http_client()
+        response = await client.get(url, headers=headers, params=params, timeout=10.0)
+        response.raise_for_status()
+
+        merge_requests = orjson.loads(response.content)
+        # GitLab reports the full count in X-Total (omitted for very large collections)
+        total = int(response.headers.get('X-Total', len(merge_requests)))
+
+        if not merge_requests:
+            return f"No {state} merge requests found in project {_current_gitlab_config.project_id}."
+
+        # Format MR list into a single buffer
+        buf = io.StringIO()
+        buf.write(f"# 📋 Merge Requests in Project {_current_gitlab_config.project_id}\n\n")
+        buf.write(f"**Filter:** {state} | **Total:** {total}\n\n")
+        buf.write("---\n\n")
+
+        for idx, mr in enumerate(merge_requests):  # Server already limited to per_page
+            # Get labels
+            mr_labels = mr.get('labels')
+            labels = ", ".join([f"`{label}`" for label in mr_labels]) if mr_labels else "None"
+
+            # Get approvals info
+            upvotes = mr.get('upvotes', 0)
+            downvotes = mr.get('downvotes', 0)
+            approvals = f"👍 {upvotes}" if upvotes > 0 else ""
+            if downvotes > 0:
+                approvals += f" 👎 {downvotes}"
+
+            # Format dates
+            created = mr['created_at'].split('T')[0]
+            updated = mr['updated_at'].split('T')[0]
+            author = mr['author']
+
+            if idx:
+                buf.write("\n\n")
+            buf.write(
+                f"### MR !{mr['iid']}: {mr['title']}\n\n"
+                f"- **Author:** {author['name']} (@{author['username']})\n"
+                f"- **Status:** `{mr['state']}` {approvals}\n"
+                f"- **Branch:** `{mr['source_branch']}` → `{mr['target_branch']}`\n"
+                f"- **Labels:** {labels}\n"
+                f"- **Created:** {created} | **Updated:** {updated}\n"
+                f"- **URL:** {mr['web_url']}"
+            )
+
+        remaining = max(0, total - len(merge_requests))
+        if remaining > 0:
+            buf.write(f"\n\n---\n\n*... and {remaining} more merge requests*")
+
+        return buf.getvalue()
 
     except httpx.HTTPStatusError as e:
         return f"❌ GitLab API Error: {e.response.status_code} - {e.response.text}"
@@ -113,24 +130,24 @@ async def get_merge_request_details(mr_number: int) -> str:
 
     try:
         # Decrypt token
-        token = decrypt_token(_current_gitlab_config.access_token_encrypted)
+        token = _decrypt_cached(bytes(_current_gitlab_config.access_token_encrypted))
         headers = {"PRIVATE-TOKEN": token}
 
-        async with httpx.AsyncClient() as client:
-            # Get MR details
-            mr_url = f"{_current_gitlab_config.gitlab_url}/api/v4/projects/{_current_gitlab_config.project_id}/merge_requests/{mr_number}"
-            mr_response = await client.get(mr_url, headers=headers, timeout=10.0)
-            mr_response.raise_for_status()
-            mr_data = mr_response.json()
-
-            # Get MR changes (diff)
-            changes_url = f"{mr_url}/changes"
-            changes_response = await client.get(changes_url, headers=headers, timeout=10.0)
-            changes_response.raise_for_status()
-            changes_data = changes_response.json()
-
-            # Format response
-            result = f"""
+        client = get_http_client()
+        # Get MR details and changes (diff) concurrently
+        mr_url = f"{_current_gitlab_config.gitlab_url}/api/v4/projects/{_current_gitlab_config.project_id}/merge_requests/{mr_number}"
+        changes_url = f"{mr_url}/changes"
+        mr_response, changes_response = await asyncio.gather(
+            client.get(mr_url, headers=headers, timeout=10.0),
+            client.get(changes_url, headers=headers, timeout=10.0)
+        )
+        mr_response.raise_for_status()
+        changes_response.raise_for_status()
+        mr_data = orjson.loads(mr_response.content)
+        changes_data = orjson.loads(changes_response.content)
+
+        # Format response
+        result = f"""
 **Merge Request !{mr_data['iid']}: {mr_data['title']}**
 
 **Author:** {mr_data['author']['name']} (@{mr_data['author']['username']})
@@ -146,25 +163,25 @@ async def get_merge_request_details(mr_number: int) -> str:
 **Changes:**
 """
 
-            # Add file changes
-            changes = changes_data.get('changes', [])
-            if changes:
-                result += f"\n{len(changes)} file(s) changed:\n\n"
-                for change in changes[:5]:  # Show first 5 files
-                    result += f"- **{change['new_path']}**\n"
-                    if change.get('diff'):
-                        # Show first few lines of diff
-                        diff_lines = change['diff'].split('\n')[:10]
-                        result += f"```diff\n{chr(10).join(diff_lines)}\n```\n\n"
-
-                if len(changes) > 5:
-                    result += f"... and {len(changes) - 5} more files\n"
-            else:
-                result += "No changes found.\n"
-
-            result += f"\n**URL:** {mr_data['web_url']}"
-
-            return result
+        # Add file changes
+        changes = changes_data.get('changes', [])
+        if changes:
+            result += f"\n{len(changes)} file(s) changed:\n\n"
+            for change in changes[:5]:  # Show first 5 files
+                result += f"- **{change['new_path']}**\n"
+                if change.get('diff'):
+                    # Show first few lines of diff (maxsplit stops scanning after line 10)
+                    diff_lines = change['diff'].split('\n', 10)[:10]
+                    result += f"```diff\n{chr(10).join(diff_lines)}\n```\n\n"
+
+            if len(changes) > 5:
+                result += f"... and {len(changes) - 5} more files\n"
+        else:
+            result += "No changes found.\n"
+
+        result += f"\n**URL:** {mr_data['web_url']}"
+
+        return result
 
     except httpx.HTTPStatusError as e:
         return f"❌ GitLab API Error: {e.response.status_code} - {e.response.text}"
@@ -1,13 +1,20 @@
 """
 GitLab credential validation utility
 """
+import asyncio
+import hashlib
 import httpx
 import logging
-from typing import Optional
+from typing import Optional, List, Tuple
+from cachetools import TTLCache
 from pydantic import BaseModel, HttpUrl, ValidationError
+from http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
+# Successful validations keyed by sha256(url:token); failures are never cached
+_validation_cache: TTLCache = TTLCache(maxsize=2000, ttl=120)
+
 
 class GitLabValidationResult(BaseModel):
     """Result of GitLab credential validation"""
@@ -20,7 +27,8 @@ class GitLabValidationResult(BaseModel):
 async def validate_gitlab_credentials(
     gitlab_url: str,
     access_token: str,
-    timeout: int = 10
+    timeout: int = 10,
+    client: Optional[httpx.AsyncClient] = None
 ) -> GitLabValidationResult:
     """
     Validate GitLab credentials by calling the GitLab API /user endpoint.
@@ -29,6 +37,7 @@ async def validate_gitlab_credentials(
         gitlab_url: Base GitLab URL (e.g., https://gitlab.com)
         access_token: GitLab personal access token
         timeout: Request timeout in seconds
+        client: HTTP client to use (defaults to the shared GitLab client)
 
     Returns:
         GitLabValidationResult with validation status and details
@@ -36,7 +45,16 @@ async def validate_gitlab_credentials(
     # Normalize URL (remove trailing slash)
     gitlab_url = gitlab_url.rstrip('/')
 
-    # Validate URL format
+    # Validate URL format (cheap scheme check before the full Pydantic parse;
+    # schemes are case-insensitive, so HTTPS://... still goes on to HttpUrl)
+    if not gitlab_url[:8].lower().startswith(('http://', 'https://')):
+        logger.warning(f"Invalid GitLab URL format: {gitlab_url}")
+        return GitLabValidationResult(
+            is_valid=False,
+            error_message="Invalid GitLab URL format",
+            error_code="invalid_url"
+        )
+
     try:
         HttpUrl(gitlab_url)  # Pydantic URL validation
     except ValidationError:
@@ -47,79 +65,120 @@ async def validate_gitlab_credentials(
             error_code="invalid_url"
         )
 
+    cache_key = hashlib.sha256(f"{gitlab_url}:{access_token}".encode()).hexdigest()
+    cached = _validation_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     # Construct API endpoint
     api_url = f"{gitlab_url}/api/v4/user"
 
     # Make API request
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        try:
-            response = await client.get(
-                api_url,
-                headers={"PRIVATE-TOKEN": access_token}
+    client = client or get_http_client()
+    try:
+        response = await client.get(
+            api_url,
+            headers={"PRIVATE-TOKEN": access_token},
+            timeout=timeout
+        )
+
+        # Check response status
+        if response.status_code == 200:
+            data = response.json()
+            username = data.get('username', 'unknown')
+            logger.info(f"GitLab validation successful for user: {username}")
+            result = GitLabValidationResult(
+                is_valid=True,
+                gitlab_username=username
+            )
+            _validation_cache[cache_key] = result
+            return result
+
+        elif response.status_code == 401:
+            logger.warning("GitLab validation failed: Invalid token")
+            return GitLabValidationResult(
+                is_valid=False,
+                error_message="Invalid access token or token expired",
+                error_code="invalid_token"
             )
 
-            # Check response status
-            if response.status_code == 200:
-                data = response.json()
-                username = data.get('username', 'unknown')
-                logger.info(f"GitLab validation successful for user: {username}")
-                return GitLabValidationResult(
-                    is_valid=True,
-                    gitlab_username=username
-                )
-
-            elif response.status_code == 401:
-                logger.warning("GitLab validation failed: Invalid token")
-                return GitLabValidationResult(
-                    is_valid=False,
-                    error_message="Invalid access token or token expired",
-                    error_code="invalid_token"
-                )
-
-            elif response.status_code == 403:
-                logger.warning("GitLab validation failed: Insufficient permissions")
-                return GitLabValidationResult(
-                    is_valid=False,
-                    error_message="Token lacks required permissions",
-                    error_code="insufficient_permissions"
-                )
-
-            elif response.status_code == 404:
-                logger.warning(f"GitLab API endpoint not found: {api_url}")
-                return GitLabValidationResult(
-                    is_valid=False,
-                    error_message="GitLab API endpoint not found - check URL",
-                    error_code="not_found"
-                )
-
-            else:
-                logger.error(f"GitLab API returned status {response.status_code}")
-                return GitLabValidationResult(
-                    is_valid=False,
-                    error_message=f"GitLab API error: {response.status_code}",
-                    error_code="api_error"
-                )
-
-        except httpx.TimeoutException:
-            logger.error(f"GitLab validation timeout for URL: {gitlab_url}")
+        elif response.status_code == 403:
+            logger.warning("GitLab validation failed: Insufficient permissions")
             return GitLabValidationResult(
                 is_valid=False,
-                error_message="Connection timeout - GitLab instance unreachable",
-                error_code="timeout"
+                error_message="Token lacks required permissions",
+                error_code="insufficient_permissions"
             )
 
-        except httpx.NetworkError as e:
-            logger.error(f"GitLab validation network error: {e}")
+        elif response.status_code == 404:
+            logger.warning(f"GitLab API endpoint not found: {api_url}")
             return GitLabValidationResult(
                 is_valid=False,
-                error_message="Network error - could not reach GitLab instance",
-                error_code="network_error"
+                error_message="GitLab API endpoint not found - check URL",
+                error_code="not_found"
             )
 
-        except Exception as e:
-            logger.error(f"Unexpected error during GitLab validation: {e}")
+        else:
+            logger.error(f"GitLab API returned status {response.status_code}")
             return GitLabValidationResult(
+                is_valid=False,
+                error_message=f"GitLab API error: {response.status_code}",
+                error_code="api_error"
+            )
+
+    except httpx.TimeoutException:
+        logger.error(f"GitLab validation timeout for URL: {gitlab_url}")
+        return GitLabValidationResult(
+            is_valid=False,
+            error_message="Connection timeout - GitLab instance unreachable",
+            error_code="timeout"
+        )
+
+    except httpx.NetworkError as e:
+        logger.error(f"GitLab validation network error: {e}")
+        return GitLabValidationResult(
+            is_valid=False,
+            error_message="Network error - could not reach GitLab instance",
+            error_code="network_error"
+        )
+
+    except Exception as e:
+        logger.error(f"Unexpected error during GitLab validation: {e}")
+        return GitLabValidationResult(
+            is_valid=False,
+            error_message="Unexpected error during validation",
+            error_code="unknown_error"
+        )
+
+
+async def validate_many(
+    items: List[Tuple[str, str]],
+    timeout: int = 10
+) -> List[GitLabValidationResult]:
+    """
+    Validate several GitLab credentials concurrently over the shared client.
+
+    Args:
+        items: List of (gitlab_url, access_token) pairs
+        timeout: Request timeout in seconds
+
+    Returns:
+        GitLabValidationResult for each pair, in the same order as items
+    """
+    client = get_http_client()
+    results = await asyncio.gather(
+        *[validate_gitlab_credentials(url, token, timeout, client) for url, token in items],
+        return_exceptions=True
+    )
+
+    validated = []
+    for result in results:
+        if isinstance(result, BaseException):
+            logger.error(f"Unexpected error during GitLab validation: {result}")
+            result = GitLabValidationResult(
                 is_valid=False,
                 error_message="Unexpected error during validation",
                 error_code="unknown_error"
             )
+        validated.append(result)
+    return validated
@@ -0,0 +1,30 @@
+"""
+Shared HTTP client for outbound GitLab API calls
+"""
+
+from typing import Optional
+import httpx
+
+
+# Shared client so repeated GitLab calls reuse keep-alive connections
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared GitLab HTTP client, creating it on first use"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=True,
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
+    return _client
+
+
+async def close_http_client():
+    """Close the shared GitLab HTTP client (called on application shutdown)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
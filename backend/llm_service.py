@@ -3,21 +3,36 @@ LLM Service - FastAPI backend with Authentication and GitLab Integration
 """
 
 import os
+import uuid
+import re
+import base64
+import httpx
+import orjson
+import asyncio
+import inspect
+import logging
+from contextlib import asynccontextmanager
 from pathlib import Path
-from datetime import datetime, timedelta
-from typing import List
+from datetime import datetime, timedelta, timezone
+from operator import attrgetter
+from typing import Any, Callable, List, Optional, Tuple
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Query, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import func, or_, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import undefer
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # Import Ollama
 from agno.models.ollama import Ollama
 from agno.agent import Agent
 
 # Import local modules
-from database import get_db, engine, Base
+from database import get_db, engine, Base, get_pool_status
 from models import User, GitLabConfig
 from schemas import (
     UserRegister, UserLogin, Token, UserResponse,
@@ -25,27 +40,60 @@ from schemas import (
     ChatRequest, ChatResponse, ModelStatus
 )
 from auth import (
-    get_password_hash, verify_password, create_access_token,
-    get_current_active_user
+    get_password_hash, verify_and_update_password, run_password_hashing,
+    create_access_token, get_current_active_user
 )
 from gitlab_validator import validate_gitlab_credentials
-from encryption import encrypt_token, decrypt_token
+from encryption import encrypt_token, decrypt_token, init_encryption
 from gitlab_agent import GitLabAgent
+from http_client import get_http_client, close_http_client
+
+logger = logging.getLogger(__name__)
 
 env_path = Path(__file__).parent.parent / ".env"
 load_dotenv(dotenv_path=env_path)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Model settings are read once at startup
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2")
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 
 # Simple in-memory session storage for user context
 # In production, use Redis or similar
 user_sessions = {}
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup/shutdown hooks"""
+    # Create database tables
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    # Derive the encryption key (possibly a PBKDF2 run) off the event loop before
+    # serving, so the first encrypt/decrypt in a request doesn't block it
+    await asyncio.to_thread(init_encryption)
+
+    # Create the shared GitLab HTTP client up front so the first request doesn't pay for it
+    get_http_client()
+
+    # Load the model on the Ollama side in the background (doesn't delay startup)
+    warm_up_task = asyncio.create_task(warm_up_ollama())
+
+    yield
+
+    warm_up_task.cancel()
+
+    await engine.dispose()
+    # Close the shared GitLab HTTP client
+    await close_http_client()
+
+
 app = FastAPI(
     title="Code Review AI Service",
     description="AI-powered code review with GitLab integration",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
@@ -54,50 +102,108 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
 # ==================== Ollama Agent ====================
 
+# Keep connections to Ollama alive between prompts
+OLLAMA_CLIENT_PARAMS = {
+    "limits": httpx.Limits(max_keepalive_connections=8, keepalive_expiry=60)
+}
+
+
 def connect_ollama() -> Agent:
     """Connect to local Ollama model"""
-    model_name = os.getenv("OLLAMA_MODEL", "llama3.2")
-    base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-    ollama_model = Ollama(id=model_name, host=base_url)
+    ollama_model = Ollama(
+        id=OLLAMA_MODEL,
+        host=OLLAMA_BASE_URL,
+        client_params=OLLAMA_CLIENT_PARAMS
+    )
     return Agent(model=ollama_model)
 
 
+async def warm_up_ollama():
+    """Send a tiny prompt so Ollama loads the model weights before the first real chat"""
+    try:
+        await agent.arun("hi")
+        logger.info(f"Ollama model {OLLAMA_MODEL} warmed up")
+    except Exception as e:
+        logger.warning(f"Ollama warm-up failed: {e}")
+
+
 agent = connect_ollama()
 
+# Getter for the reply text, chosen from the first run output's shape. The chat
+# agent always returns the same type, so the attribute probing only happens once.
+_response_extractor: Optional[Callable[[Any], Any]] = None
+
+
+def _select_response_extractor(run_output) -> Callable[[Any], Any]:
+    """Pick the getter that extracts the reply text from this kind of run output"""
+    if hasattr(run_output, 'content'):
+        return attrgetter('content')
+    if hasattr(run_output, 'text'):
+        return attrgetter('text')
+    if hasattr(run_output, 'message'):
+        if hasattr(run_output.message, 'content'):
+            return attrgetter('message.content')
+        return lambda output: str(output.message)
+    return str
+
+
+def _extract_chat_text(run_output):
+    """Extract the reply text from a chat agent run output"""
+    global _response_extractor
+    if _response_extractor is None:
+        _response_extractor = _select_response_extractor(run_output)
+    return _response_extractor(run_output)
+
 
 # ==================== Authentication Endpoints ====================
 
 @app.post("/api/auth/register", response_model=Token, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register(user_data: UserRegister, db: AsyncSession = Depends(get_db)):
     """Register a new user"""
-    # Check if user already exists
-    existing_user = db.query(User).filter(
-        (User.email == user_data.email) | (User.username == user_data.username)
-    ).first()
-
-    if existing_user:
+    # Cheap index lookup so duplicate sign-ups are rejected before paying for a hash
+    existing = await db.execute(
+        select(User.id)
+        .where(or_(User.email == user_data.email, User.username == user_data.username))
+        .limit(1)
+    )
+    if existing.scalar_one_or_none() is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email or username already registered"
         )
 
-    # Create new user
-    hashed_password = get_password_hash(user_data.password)
-    new_user = User(
-        email=user_data.email,
-        username=user_data.username,
-        password_hash=hashed_password,
-        full_name=user_data.full_name
+    # Password hashing is CPU-bound; hash off the event loop
+    hashed_password = await run_password_hashing(get_password_hash, user_data.password)
+    # Insert in a single round-trip; a unique conflict on email or username
+    # (e.g. a concurrent sign-up) makes the INSERT return no row instead of raising
+    stmt = (
+        pg_insert(User)
+        .values(
+            email=user_data.email,
+            username=user_data.username,
+            password_hash=hashed_password,
+            full_name=user_data.full_name
+        )
+        .on_conflict_do_nothing()
+        .returning(User)
     )
+    result = await db.execute(stmt)
+    new_user = result.scalar_one_or_none()
 
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    if new_user is None:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email or username already registered"
+        )
+
+    await db.commit()
 
     # Create access token
     access_token = create_access_token(
@@ -114,13 +220,21 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
 @app.post("/api/auth/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Login user and return JWT token"""
     # Find user by email (username field in OAuth2 form)
-    user = db.query(User).filter(User.email == form_data.username).first()
+    result = await db.execute(select(User).where(User.email == form_data.username))
+    user = result.scalar_one_or_none()
+
+    # Password hashing is CPU-bound; verify (and rehash if needed) off the event loop
+    password_ok, new_hash = False, None
+    if user is not None:
+        password_ok, new_hash = await run_password_hashing(
+            verify_and_update_password, form_data.password, user.password_hash
+        )
 
-    if not user or not verify_password(form_data.password, user.password_hash):
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -133,9 +247,13 @@ async def login(
             detail="Account is inactive"
         )
 
-    # Update last login
-    user.last_login = datetime.utcnow()
-    db.commit()
+    # Upgrade legacy (bcrypt) hashes to Argon2id
+    if new_hash:
+        user.password_hash = new_hash
+
+    # Update last login (rendered as NOW() on the database side)
+    user.last_login = func.now()
+    await db.commit()
 
     # Create access token
     access_token = create_access_token(
@@ -150,32 +268,39 @@ async def login(
 
 
 @app.get("/api/auth/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_active_user)):
+async def get_current_user_info(current_user: UserResponse = Depends(get_current_active_user)):
     """Get current user information"""
     return current_user
 
 
 # ==================== GitLab Configuration Endpoints ====================
 
+# Columns GitLabConfigResponse needs; read-only endpoints select only these so the
+# encrypted token is never loaded
+CONFIG_RESPONSE_COLUMNS = (
+    GitLabConfig.id,
+    GitLabConfig.config_name,
+    GitLabConfig.gitlab_url,
+    GitLabConfig.project_id,
+    GitLabConfig.is_active,
+    GitLabConfig.created_at,
+    GitLabConfig.updated_at,
+)
+
+def _attach_validation_details(config: GitLabConfig, validation_result) -> None:
+    """Set the non-persisted validation fields GitLabConfigResponse reads from the ORM object"""
+    config.validation_message = validation_result.error_message or "Credentials validated successfully"
+    config.validation_error_code = validation_result.error_code
+    config.gitlab_username = validation_result.gitlab_username
+
+
 @app.post("/api/gitlab/config", response_model=GitLabConfigResponse, status_code=status.HTTP_201_CREATED)
 async def create_gitlab_config(
     config_data: GitLabConfigCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: UserResponse = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Create or update GitLab configuration for current user"""
-    # Check if config already exists for this URL
-    existing_config = db.query(GitLabConfig).filter(
-        GitLabConfig.user_id == current_user.id,
-        GitLabConfig.gitlab_url == config_data.gitlab_url
-    ).first()
-
-    if existing_config:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="GitLab configuration for this URL already exists"
-        )
-
     # Validate GitLab credentials
     validation_result = await validate_gitlab_credentials(
         config_data.gitlab_url,
@@ -195,72 +320,113 @@ async def create_gitlab_config(
         is_active=validation_result.is_valid  # Set based on validation
     )
 
+    # Duplicate URLs per user are rejected by the (user_id, gitlab_url) unique constraint
     db.add(new_config)
-    db.commit()
-    db.refresh(new_config)
-
-    # Build response with validation details (computed, not stored in DB)
-    response_dict = {
-        "id": str(new_config.id),
-        "config_name": new_config.config_name,
-        "gitlab_url": new_config.gitlab_url,
-        "project_id": new_config.project_id,
-        "is_active": new_config.is_active,
-        "created_at": new_config.created_at,
-        "updated_at": new_config.updated_at,
-        "validation_message": validation_result.error_message or "Credentials validated successfully",
-        "validation_error_code": validation_result.error_code,
-        "gitlab_username": validation_result.gitlab_username
-    }
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="GitLab configuration for this URL already exists"
+        )
+
+    # Attach validation details (computed, not stored in DB)
+    _attach_validation_details(new_config, validation_result)
+    return new_config
+
 
-    return response_dict
+def _encode_config_cursor(config) -> str:
+    """Opaque keyset cursor pointing after the given config"""
+    raw = f"{config.created_at.isoformat()}|{config.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_config_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Decode a keyset cursor into (created_at, id)"""
+    try:
+        created_at, config_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(config_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
 
 
 @app.get("/api/gitlab/configs", response_model=List[GitLabConfigResponse])
 async def get_gitlab_configs(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = None,
+    current_user: UserResponse = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all GitLab configurations for current user"""
-    configs = db.query(GitLabConfig).filter(
-        GitLabConfig.user_id == current_user.id
-    ).all()
-    return configs
+    """
+    Get GitLab configurations for current user, oldest first
+
+    Returns all configs unless `limit` is given. Paging is opt-in and uses keyset
+    pagination on (created_at, id); when more results exist the cursor for the
+    next page is returned in the X-Next-Cursor header.
+    """
+    query = select(*CONFIG_RESPONSE_COLUMNS).where(GitLabConfig.user_id == current_user.id)
+    if cursor:
+        cursor_created_at, cursor_id = _decode_config_cursor(cursor)
+        query = query.where(
+            tuple_(GitLabConfig.created_at, GitLabConfig.id) > tuple_(cursor_created_at, cursor_id)
+        )
+    query = query.order_by(GitLabConfig.created_at, GitLabConfig.id)
+    if limit is not None:
+        query = query.limit(limit)
+
+    result = await db.execute(query)
+    rows = result.all()
+
+    if limit is not None and len(rows) == limit:
+        response.headers["X-Next-Cursor"] = _encode_config_cursor(rows[-1])
+
+    return [GitLabConfigResponse.model_validate(row._mapping) for row in rows]
 
 
 @app.get("/api/gitlab/config/{config_id}", response_model=GitLabConfigResponse)
 async def get_gitlab_config(
     config_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: UserResponse = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get a specific GitLab configuration"""
-    config = db.query(GitLabConfig).filter(
-        GitLabConfig.id == config_id,
-        GitLabConfig.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(*CONFIG_RESPONSE_COLUMNS).where(
+            GitLabConfig.id == config_id,
+            GitLabConfig.user_id == current_user.id
+        )
+    )
+    row = result.one_or_none()
 
-    if not config:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="GitLab configuration not found"
         )
 
-    return config
+    return GitLabConfigResponse.model_validate(row._mapping)
 
 
 @app.put("/api/gitlab/config/{config_id}", response_model=GitLabConfigResponse)
 async def update_gitlab_config(
     config_id: str,
     config_update: GitLabConfigUpdate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: UserResponse = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Update GitLab configuration"""
-    config = db.query(GitLabConfig).filter(
-        GitLabConfig.id == config_id,
-        GitLabConfig.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(GitLabConfig).where(
+            GitLabConfig.id == config_id,
+            GitLabConfig.user_id == current_user.id
+        )
+    )
+    config = result.scalar_one_or_none()
 
     if not config:
         raise HTTPException(
@@ -293,25 +459,19 @@ async def update_gitlab_config(
         # Only allow manual is_active updates if token is not being changed
         config.is_active = config_update.is_active
 
-    config.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(config)
+    # updated_at is set by the model's onupdate=func.now()
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="GitLab configuration for this URL already exists"
+        )
 
-    # Build response with validation details if validation occurred
+    # Attach validation details if validation occurred
     if validation_result:
-        response_dict = {
-            "id": str(config.id),
-            "config_name": config.config_name,
-            "gitlab_url": config.gitlab_url,
-            "project_id": config.project_id,
-            "is_active": config.is_active,
-            "created_at": config.created_at,
-            "updated_at": config.updated_at,
-            "validation_message": validation_result.error_message or "Credentials validated successfully",
-            "validation_error_code": validation_result.error_code,
-            "gitlab_username": validation_result.gitlab_username
-        }
-        return response_dict
+        _attach_validation_details(config, validation_result)
 
     return config
 
@@ -319,14 +479,17 @@ async def update_gitlab_config(
 @app.delete("/api/gitlab/config/{config_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_gitlab_config(
     config_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: UserResponse = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete GitLab configuration"""
-    config = db.query(GitLabConfig).filter(
-        GitLabConfig.id == config_id,
-        GitLabConfig.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(GitLabConfig).where(
+            GitLabConfig.id == config_id,
+            GitLabConfig.user_id == current_user.id
+        )
+    )
+    config = result.scalar_one_or_none()
 
     if not config:
         raise HTTPException(
@@ -334,8 +497,8 @@ async def delete_gitlab_config(
             detail="GitLab configuration not found"
         )
 
-    db.delete(config)
-    db.commit()
+    await db.delete(config)
+    await db.commit()
 
     return None
 
@@ -346,101 +509,153 @@ async def delete_gitlab_config(
 async def get_status() -> ModelStatus:
     """Get current model status"""
     try:
-        model_name = os.getenv("OLLAMA_MODEL", "llama3.2")
         return ModelStatus(
             status="active",
-            model_name=model_name,
-            last_updated=datetime.now().isoformat()
+            model_name=OLLAMA_MODEL,
+            last_updated=datetime.now(timezone.utc).isoformat()
         )
     except Exception as e:
         return ModelStatus(
             status="inactive",
             model_name="unknown",
-            last_updated=datetime.now().isoformat()
+            last_updated=datetime.now(timezone.utc).isoformat()
         )
 
 
+# Broad check for chat messages that might be GitLab-related (any keyword matches)
+_GITLAB_KEYWORDS_RE = re.compile(
+    r'\bMR\b|\bmerge\s+request\b|\bgitlab\b'
+    r'|!\d+|\bpull\s+request\b|\bPR\b'
+    r'|\blist\b.*\brequest|\bshow\b.*\brequest'
+    r'|\breview\b|\bcode\s+review\b',
+    re.IGNORECASE
+)
+
+
+async def _handle_gitlab_message(message: str, current_user: UserResponse, db: AsyncSession) -> Optional[str]:
+    """
+    Route a chat message to the GitLab agent if it looks GitLab-related
+
+    Returns:
+        The GitLab agent's response, or None if the message should go to regular chat
+    """
+    # Broad check - let the agent decide if it's truly GitLab-related
+    if not _GITLAB_KEYWORDS_RE.search(message):
+        return None
+
+    # Get user's GitLab configurations
+    result = await db.execute(
+        select(GitLabConfig)
+        .options(undefer(GitLabConfig.access_token_encrypted))
+        .where(GitLabConfig.user_id == current_user.id)
+    )
+    gitlab_configs = result.scalars().all()
+    if not gitlab_configs:
+        return None
+
+    # Create GitLab agent
+    gitlab_agent = GitLabAgent(
+        user_id=str(current_user.id),
+        gitlab_configs=gitlab_configs
+    )
+
+    # Get last used config from session
+    user_session = user_sessions.get(str(current_user.id), {})
+    last_config_id = user_session.get('last_config_id')
+
+    # Let the agent intelligently handle the query
+    return await gitlab_agent.handle_query(
+        message,
+        last_config_id=last_config_id
+    )
+
+
 @app.post("/api/chat")
 async def chat(
     request: ChatRequest,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: UserResponse = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ) -> ChatResponse:
     """Send message to Ollama model (requires authentication)"""
     try:
-        # Check if message might be GitLab-related (broad check)
-        import re
-        gitlab_keywords = [
-            r'\bMR\b', r'\bmerge\s+request\b', r'\bgitlab\b',
-            r'!\d+', r'\bpull\s+request\b', r'\bPR\b',
-            r'\blist\b.*\brequest', r'\bshow\b.*\brequest',
-            r'\breview\b', r'\bcode\s+review\b'
-        ]
-
-        # Broad check - let the agent decide if it's truly GitLab-related
-        might_be_gitlab = any(re.search(pattern, request.message, re.IGNORECASE) for pattern in gitlab_keywords)
-
-        if might_be_gitlab:
-            # Get user's GitLab configurations
-            gitlab_configs = db.query(GitLabConfig).filter(
-                GitLabConfig.user_id == current_user.id
-            ).all()
-
-            if gitlab_configs:
-                # Create GitLab agent
-                gitlab_agent = GitLabAgent(
-                    user_id=str(current_user.id),
-                    gitlab_configs=gitlab_configs
-                )
-
-                # Get last used config from session
-                user_session = user_sessions.get(str(current_user.id), {})
-                last_config_id = user_session.get('last_config_id')
-
-                # Let the agent intelligently handle the query
-                gitlab_response = await gitlab_agent.handle_query(
-                    request.message,
-                    last_config_id=last_config_id
-                )
-
-                # If agent determined it's a GitLab query, return the response
-                if gitlab_response:
-                    return ChatResponse(
-                        response=gitlab_response,
-                        model=os.getenv("OLLAMA_MODEL", "llama3.2"),
-                        timestamp=datetime.now().isoformat()
-                    )
-
-        # Fall back to regular chat
-        run_output = agent.run(request.message)
-
-        response_text = ""
-        if hasattr(run_output, 'content'):
-            response_text = run_output.content
-        elif hasattr(run_output, 'text'):
-            response_text = run_output.text
-        elif hasattr(run_output, 'message'):
-            if hasattr(run_output.message, 'content'):
-                response_text = run_output.message.content
-            else:
-                response_text = str(run_output.message)
-        else:
-            response_text = str(run_output)
+        gitlab_response = await _handle_gitlab_message(request.message, current_user, db)
+
+        # If agent determined it's a GitLab query, return the response
+        if gitlab_response:
+            return ChatResponse(
+                response=gitlab_response,
+                model=OLLAMA_MODEL,
+                timestamp=datetime.now(timezone.utc).isoformat()
+            )
+
+        # Fall back to regular chat (async run keeps the event loop free)
+        run_output = await agent.arun(request.message)
+
+        response_text = _extract_chat_text(run_output)
 
         return ChatResponse(
             response=response_text,
-            model=os.getenv("OLLAMA_MODEL", "llama3.2"),
-            timestamp=datetime.now().isoformat()
+            model=OLLAMA_MODEL,
+            timestamp=datetime.now(timezone.utc).isoformat()
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Model error: {str(e)}")
 
 
+@app.post("/api/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    current_user: UserResponse = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+) -> StreamingResponse:
+    """
+    Stream the model's reply as Server-Sent Events (requires authentication)
+
+    Each event is a JSON object: {"delta": "..."} for content chunks, then a final
+    {"done": true, "model": ..., "timestamp": ...}; errors are sent as {"error": "..."}.
+    GitLab queries are answered in a single delta.
+    """
+    # Routed before streaming starts, while the request's DB session is still open
+    try:
+        gitlab_response = await _handle_gitlab_message(request.message, current_user, db)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Model error: {str(e)}")
+
+    async def event_stream():
+        try:
+            if gitlab_response:
+                yield f"data: {orjson.dumps({'delta': gitlab_response}).decode()}\n\n"
+            else:
+                stream = agent.arun(request.message, stream=True)
+                if inspect.isawaitable(stream):
+                    stream = await stream
+                async for chunk in stream:
+                    delta = getattr(chunk, 'content', None)
+                    if isinstance(delta, str) and delta:
+                        yield f"data: {orjson.dumps({'delta': delta}).decode()}\n\n"
+
+            done = {
+                "done": True,
+                "model": OLLAMA_MODEL,
+                "timestamp": datetime.now(timezone.utc).isoformat()
+            }
+            yield f"data: {orjson.dumps(done).decode()}\n\n"
+        except Exception as e:
+            yield f"data: {orjson.dumps({'error': f'Model error: {str(e)}'}).decode()}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # Stop proxies (e.g. nginx) from caching or buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.post("/api/slash-command")
 async def handle_slash_command(
     request: dict,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: UserResponse = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ) -> ChatResponse:
     """
     Handle slash commands with GitLab agent
@@ -457,9 +672,12 @@ async def handle_slash_command(
         command = request.get("command", "")
 
         # Get user's GitLab configurations
-        gitlab_configs = db.query(GitLabConfig).filter(
-            GitLabConfig.user_id == current_user.id
-        ).all()
+        result = await db.execute(
+            select(GitLabConfig)
+            .options(undefer(GitLabConfig.access_token_encrypted))
+            .where(GitLabConfig.user_id == current_user.id)
+        )
+        gitlab_configs = result.scalars().all()
 
         # Create GitLab agent
         gitlab_agent = GitLabAgent(
@@ -480,12 +698,12 @@ async def handle_slash_command(
             }
         else:
             # Ask user to select a config
-            response_text = await gitlab_agent.process_command(command)
+            response_text = gitlab_agent.process_command(command)
 
         return ChatResponse(
             response=response_text,
-            model=os.getenv("OLLAMA_MODEL", "llama3.2"),
-            timestamp=datetime.now().isoformat()
+            model=OLLAMA_MODEL,
+            timestamp=datetime.now(timezone.utc).isoformat()
         )
 
     except Exception as e:
@@ -499,10 +717,13 @@ async def handle_slash_command(
 async def health():
     """Health check endpoint"""
     try:
+        pool_status = get_pool_status()
+        logger.info(f"Database pool status: {pool_status}")
         return {
             "status": "connected",
-            "model": os.getenv("OLLAMA_MODEL"),
-            "host": os.getenv("OLLAMA_BASE_URL")
+            "model": OLLAMA_MODEL,
+            "host": OLLAMA_BASE_URL,
+            "db_pool": pool_status
         }
     except Exception as e:
         return {"status": "disconnected", "error": str(e)}
@@ -0,0 +1,16 @@
+-- Migration: Enforce one GitLab configuration per URL for each user
+-- Date: 2026-10-15
+-- Description: create_gitlab_config relies on this constraint (instead of a
+-- pre-insert SELECT) to reject duplicate URLs. init-db.sql already declares it;
+-- this adds it to databases whose table was created without it.
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conname = 'gitlab_configs_user_id_gitlab_url_key'
+    ) THEN
+        ALTER TABLE gitlab_configs
+        ADD CONSTRAINT gitlab_configs_user_id_gitlab_url_key UNIQUE (user_id, gitlab_url);
+    END IF;
+END $$;
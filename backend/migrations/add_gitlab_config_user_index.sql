@@ -0,0 +1,8 @@
+-- Migration: Index gitlab_configs lookups by user
+-- Date: 2026-10-15
+-- Description: Every config endpoint filters gitlab_configs by user_id (plus id or
+-- gitlab_url). init-db.sql already creates this index; this adds it to databases
+-- whose tables were created from the SQLAlchemy models without it. The
+-- (user_id, gitlab_url) unique index comes from add_gitlab_config_unique_url.sql.
+
+CREATE INDEX IF NOT EXISTS idx_gitlab_configs_user_id ON gitlab_configs(user_id);
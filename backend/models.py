@@ -1,9 +1,9 @@
 """
 SQLAlchemy database models
 """
-from sqlalchemy import Column, String, Boolean, ForeignKey, Text, DateTime, LargeBinary, JSON
+from sqlalchemy import Column, String, Boolean, ForeignKey, Text, DateTime, LargeBinary, JSON, UniqueConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 import uuid
 from database import Base
@@ -30,12 +30,21 @@ class User(Base):
 
 class GitLabConfig(Base):
     __tablename__ = "gitlab_configs"
+    __table_args__ = (
+        # Same names as the index/constraint created by init-db.sql
+        Index("idx_gitlab_configs_user_id", "user_id"),
+        UniqueConstraint("user_id", "gitlab_url", name="gitlab_configs_user_id_gitlab_url_key"),
+    )
+    # Fetch server-generated created_at/updated_at via RETURNING in the INSERT/UPDATE
+    # itself, so handlers don't need a refresh SELECT after commit
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     config_name = Column(String(255))  # Friendly name to identify this config (e.g., "Personal GitLab", "Work Account")
     gitlab_url = Column(String(500), nullable=False)
-    access_token_encrypted = Column(LargeBinary, nullable=False)
+    # Deferred so config listings never pull the ciphertext; load with undefer() when needed
+    access_token_encrypted = deferred(Column(LargeBinary, nullable=False))
     project_id = Column(String(255))
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
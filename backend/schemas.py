@@ -1,7 +1,7 @@
 """
 Pydantic schemas for request/response validation
 """
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from typing import Optional
 from datetime import datetime
 from uuid import UUID
@@ -35,8 +35,11 @@ class UserResponse(BaseModel):
     is_verified: bool
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Resolve the forward reference to UserResponse once at import
+Token.model_rebuild()
 
 
 # GitLab Configuration Schemas
@@ -67,8 +70,7 @@ class GitLabConfigResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Chat Schemas (existing)
@@ -83,7 +85,7 @@ class ChatResponse(BaseModel):
 
 
 class ModelStatus(BaseModel):
-    model_config = {"protected_namespaces": ()}
+    model_config = ConfigDict(protected_namespaces=())
 
     status: str
     model_name: str